@@ -1,7 +1,161 @@
 import argparse
+import hashlib
+import multiprocessing
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
+import xlsxwriter
+
+# Copy-on-write keeps the per-month slices as views until a column is
+# actually written, instead of eagerly duplicating the frame. Default
+# from pandas 3.0; opted into explicitly for pandas 2.x installs.
+try:
+    pd.set_option('mode.copy_on_write', True)
+except Exception:
+    pass
+
+# Strips surrounding whitespace and the trailing ".0" Excel puts on
+# numeric invoice numbers, in a single pass over the column.
+INV_CLEAN_RE = re.compile(r'^\s*(.*?)(?:\.0)?\s*$')
+
+# Turns accounting-format amounts like "$(1,234.56)" into "-1234.56"
+# with one translation pass per string.
+CURRENCY_CLEAN_TABLE = str.maketrans({'(': '-', ')': '', ',': '', '$': ''})
+
+# Roots of the two invoice image repositories; the per-quarter folder
+# is appended at run time
+DROPBOX_BASE = "www.dropbox.com"
+F_DRIVE_BASE = "F:"
+IMAGE_ROOT = "Images MP-BC-AP R4Q2"
+
+# Blank tax-entry columns appended for the review team
+EXTRA_TAX_COLS = [
+    'UT + SJ Combined Sales Tax',
+    'Utah State Sales Tax',
+    'San Juan County Sales Tax',
+    'Other local Utah tax',
+    'Other entity collecting tax',
+    'Sum of UT Tx Excl Chrgd by N.N.',
+    'NNOGC Entity Tax Pd Amt',
+    'Poley Team Notes',
+]
+
+# Column ranges collapsed behind an outline level in the report
+HIDDEN_COL_GROUPS = [
+    ('Owner', 'Billing Cat Type'),
+    ('Txn Net Amt', 'Interest'),
+    ('Property Hid', 'Vendor Code'),
+    ('Addr 1', None),
+    ('Billing Date', 'Color Code'),
+]
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Rust-backed Excel parsing is several times faster than openpyxl's
+# pure-Python XML walk; fall back to pandas' default engine without it.
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = None
+
+def load_csv(path):
+    if HAS_PYARROW:
+        try:
+            return pd.read_csv(path, engine='pyarrow')
+        except (UnicodeDecodeError, ValueError):
+            return pd.read_csv(path, encoding='latin1', engine='pyarrow')
+    try:
+        return pd.read_csv(path, low_memory=False)
+    except UnicodeDecodeError:
+        return pd.read_csv(path, encoding='latin1', low_memory=False)
+
+def find_header_row(path, sheet_name=None, max_rows=50):
+    # Stream only the first rows read-only instead of parsing the whole
+    # sheet, so the header scan is O(50 rows) not O(filesize).
+    keywords = {'TXN INVOICE NO', 'TXN GROSS AMT', 'INVOICE #'}
+    try:
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True, data_only=True)
+    except Exception:
+        return 0
+    try:
+        ws = wb[sheet_name] if sheet_name in wb.sheetnames else wb.active
+        for r_idx, row in enumerate(ws.iter_rows(min_row=1, max_row=max_rows, values_only=True)):
+            vals = {str(v).strip().upper() for v in row if v is not None}
+            if vals & keywords:
+                return r_idx
+    finally:
+        wb.close()
+    return 0
+
+def load_jib(path):
+    if path.lower().endswith('.csv'):
+        return load_csv(path)
+    xl = pd.ExcelFile(path, engine=EXCEL_ENGINE)
+    try:
+        sheet_name = xl.sheet_names[0]
+        for name in xl.sheet_names:
+            if 'JIB DETAIL' in name.upper() or 'JIB' in name.upper():
+                if 'PIVOT' not in name.upper():
+                    sheet_name = name
+                    break
+        return pd.read_excel(xl, sheet_name=sheet_name, skiprows=find_header_row(path, sheet_name))
+    finally:
+        xl.close()
+
+def load_ref(path):
+    if path.lower().endswith('.csv'):
+        return load_csv(path)
+    return pd.read_excel(path, skiprows=find_header_row(path), engine=EXCEL_ENGINE)
+
+def load_cached(path, loader):
+    # Opt-in Parquet cache (SALESTAX_CACHE=1): re-runs against the same
+    # source file skip the slow Excel/CSV parse entirely. The cache file
+    # is keyed on the source's absolute path, mtime and size, so an
+    # edited or replaced workbook can never be served stale.
+    if os.environ.get('SALESTAX_CACHE') != '1' or not HAS_PYARROW:
+        return loader(path)
+    try:
+        st = os.stat(path)
+        key = hashlib.sha1(
+            f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}".encode()
+        ).hexdigest()
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), '.salestax_cache')
+        cache = os.path.join(cache_dir, key + '.parquet')
+        if os.path.exists(cache):
+            return pd.read_parquet(cache)
+    except Exception:
+        return loader(path)
+    df = loader(path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        df.to_parquet(cache, compression='zstd', index=False)
+    except Exception:
+        pass
+    return df
+
+def diet(df):
+    # Shrink default dtypes after load: downcast int64 columns and move
+    # object strings onto the (Arrow-backed, when available) string dtype
+    # so the per-month sorts and groupbys touch less memory. Floats stay
+    # float64 — gross amounts feed currency sums where float32 drops cents.
+    for c in df.select_dtypes('integer').columns:
+        df[c] = pd.to_numeric(df[c], downcast='integer')
+    str_dtype = 'string[pyarrow]' if HAS_PYARROW else 'string'
+    # Catch both classic object columns (pandas 2 loads) and the native
+    # string dtype pandas 3 infers, so every text column lands on the
+    # contiguous Arrow buffer rather than per-row Python objects.
+    for c in df.select_dtypes(include=['object', 'string']).columns:
+        if df[c].dtype != str_dtype:
+            df[c] = df[c].astype(str_dtype)
+    return df
 
 def load_config(txt_path):
     with open(txt_path, 'r') as f:
@@ -11,18 +165,11 @@ def load_config(txt_path):
     return lines[0], lines[1], lines[2]
 
 def run(jib_path, ref_path, out_path, year, months):
-    print("Loading JIB Excel file...")
-    xl = pd.ExcelFile(jib_path)
-    sheet_name = xl.sheet_names[0]
-    for name in xl.sheet_names:
-        if 'JIB DETAIL' in name.upper() or 'JIB' in name.upper():
-            if 'PIVOT' not in name.upper():
-                sheet_name = name
-                break
-    df = pd.read_excel(jib_path, sheet_name=sheet_name)
-    
-    print("Loading Invoice Reference Excel file...")
-    ref_df = pd.read_excel(ref_path)
+    print("Loading JIB file...")
+    df = diet(load_cached(jib_path, load_jib))
+
+    print("Loading Invoice Reference file...")
+    ref_df = diet(load_cached(ref_path, load_ref))
 
     print("Processing JIB Data...")
     if 'Name 1' in df.columns:
@@ -31,145 +178,229 @@ def run(jib_path, ref_path, out_path, year, months):
     if 'Nnogc Entity Tax Pd Amt' in df.columns:
         df.rename(columns={'Nnogc Entity Tax Pd Amt': 'NNOGC Entity Tax Pd Amt'}, inplace=True)
 
-    # Convert Txn Inv Date
+    # Clean currency-formatted gross amounts, e.g. "$1,234.56" or
+    # "(500.00)": a single character-translation pass per string, instead
+    # of four chained replaces each allocating an intermediate column.
+    if 'Txn Gross Amt' in df.columns and not pd.api.types.is_numeric_dtype(df['Txn Gross Amt']):
+        s = df['Txn Gross Amt'].astype(str).str.translate(CURRENCY_CLEAN_TABLE)
+        df['Txn Gross Amt'] = pd.to_numeric(s, errors='coerce')
+
+    # Normalize invoice numbers so JIB and the reference file key the same way
+    if 'Txn Invoice No' in df.columns:
+        df['Txn Invoice No'] = df['Txn Invoice No'].astype(str).str.extract(INV_CLEAN_RE, expand=False)
+        # Remove GJ or PE entries here, before the month grouping, so the
+        # excluded rows never reach the per-month sort/groupby/link stages.
+        # They form their own invoices, so per-invoice totals are unchanged.
+        df = df[~df['Txn Invoice No'].str.match(r'(?:GJ|PE)', case=False, na=False)]
+
+    # Reduce to the requested months up front so the category cast, the
+    # grouping indexer and every per-month step work on the smallest
+    # possible frame.
     if 'Txn Inv Date' in df.columns:
-        df['Txn Inv Date parsed'] = pd.to_datetime(df['Txn Inv Date'], errors='coerce')
-        df = df.sort_values('Txn Inv Date parsed').reset_index(drop=True)
-        valid_idx = df[(df['Txn Inv Date parsed'].dt.year == int(year)) & (df['Txn Inv Date parsed'].dt.month.isin(months))].index
-        if not valid_idx.empty:
-            min_idx = max(0, valid_idx.min() - 1)
-            max_idx = min(len(df) - 1, valid_idx.max() + 1)
-            df = df.iloc[min_idx:max_idx+1].copy()
-            df.drop(columns=['Txn Inv Date parsed'], inplace=True)
-            df.reset_index(drop=True, inplace=True)
+        inv_dates = pd.to_datetime(df['Txn Inv Date'], errors='coerce')
+        ym = (inv_dates.dt.year * 100 + inv_dates.dt.month).fillna(0).astype('int32')
+        keep = ym.isin([int(year) * 100 + int(m) for m in months])
+        df = df.loc[keep].reset_index(drop=True)
+        ym = ym.loc[keep].reset_index(drop=True)
+    else:
+        ym = None
+
+    # Categorical keys: the sorts and the per-invoice groupby below then
+    # run on factorized integer codes instead of hashing Python strings.
+    for c in ('Vendor Name', 'Txn Invoice No', 'Property', 'Billing Cat'):
+        if c in df.columns:
+            df[c] = df[c].astype('category')
+
+    # Reference-side prep is month-independent, so build the
+    # first-row-per-invoice image lookup once for all months. Only image
+    # columns the reference file actually has are materialized — the
+    # lookup is a hash-probe map per column, not a per-row dict walk.
+    inv_col = 'Invoice #' if 'Invoice #' in ref_df.columns else ref_df.columns[0]
+    ref_df[inv_col] = ref_df[inv_col].astype(str).str.extract(INV_CLEAN_RE, expand=False)
+    inv_idx = ref_df.columns.get_loc(inv_col)
+    img_cols = list(ref_df.columns[inv_idx+1 : inv_idx+5])
+    img_lookup = ref_df.drop_duplicates(subset=[inv_col], keep='first').set_index(inv_col)[img_cols]
+
+    # Build the (year, month) grouping once so each requested month is an
+    # O(selection) slice instead of a fresh scan of the date column.
+    month_groups = df.groupby(ym) if ym is not None else None
+
+    tasks = []
+    for month in months:
+        if month_groups is not None:
+            key = int(year) * 100 + int(month)
+            if key not in month_groups.groups:
+                print(f"Warning: No records found for {int(month):02d}/{year}.")
+                continue
+            df_month = month_groups.get_group(key)
         else:
-            print("Warning: No records found for the specified month(s) and year.")
-    
-    # Sort
+            df_month = df
+        tasks.append((df_month, int(month)))
+
+    # A single-file out_path can only name one workbook; with several
+    # months every worker would write that same file concurrently. Derive
+    # a per-month name from the given one so each month keeps its report.
+    if len(tasks) > 1 and out_path and not os.path.isdir(out_path):
+        root, ext = os.path.splitext(out_path)
+        month_paths = {month: f"{root} {month:02d}{ext or '.xlsx'}" for _, month in tasks}
+        print("Output path names a single file; writing one file per month instead.")
+    else:
+        month_paths = {month: out_path for _, month in tasks}
+
+    # Months are independent (each writes its own workbook), so fan a
+    # multi-month run out across cores; the Excel write dominates each
+    # month's wall time and scales cleanly.
+    if len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(len(tasks), os.cpu_count() or 1)) as ex:
+            futures = [ex.submit(process_month, df_month, img_lookup, month_paths[month], year, month)
+                       for df_month, month in tasks]
+            for future in futures:
+                future.result()
+    else:
+        for df_month, month in tasks:
+            process_month(df_month, img_lookup, month_paths[month], year, month)
+
+def process_month(df, img_lookup, out_path, year, month):
+    print(f"Processing {int(month):02d}/{year}...")
     sort_cols = ['Vendor Name', 'Txn Invoice No', 'Property', 'Billing Cat', 'Txn Gross Amt']
     asc = [True, True, True, True, False]
     valid_sort = [c for c in sort_cols if c in df.columns]
     valid_asc = [asc[i] for i, c in enumerate(sort_cols) if c in df.columns]
-    if valid_sort:
-        df = df.sort_values(by=valid_sort, ascending=valid_asc)
-    
-    # Gross amounts
+
+    # Gross amounts. The dedup key includes Txn Gross Amt itself, so rows
+    # sharing a key carry the same amount and neither the flagged "first"
+    # occurrence value nor the per-invoice sum depends on row order —
+    # which lets us skip the pre-sort and sort only once below.
     if valid_sort:
         is_duplicate = df.duplicated(subset=valid_sort, keep='first')
         if 'Txn Gross Amt' in df.columns:
             df['Gross amount of first occurrence'] = np.where(is_duplicate, 0, df['Txn Gross Amt'])
-            df['Gross Amount of 100% of Invoice'] = df.groupby('Txn Invoice No')['Gross amount of first occurrence'].transform('sum')
-    
-    # Sort again
-    sort2 = ['Gross Amount of 100% of Invoice', 'Vendor Name', 'Txn Invoice No', 'Property', 'Billing Cat', 'Txn Gross Amt']
-    asc2 = [False, True, True, True, True, False]
+            totals = df.groupby('Txn Invoice No', sort=False, observed=True)['Gross amount of first occurrence'].sum()
+            # astype guards against map returning a categorical result
+            # when the category-to-total mapping happens to be one-to-one
+            df['Gross Amount of 100% of Invoice'] = df['Txn Invoice No'].map(totals).astype('float64')
+
+    # Single sort on the full output key
+    sort2 = ['Gross Amount of 100% of Invoice'] + sort_cols
+    asc2 = [False] + asc
     v_sort2 = [c for c in sort2 if c in df.columns]
     v_asc2 = [asc2[i] for i, c in enumerate(sort2) if c in df.columns]
     if v_sort2:
-        df = df.sort_values(by=v_sort2, ascending=v_asc2)
-    
+        df = df.sort_values(by=v_sort2, ascending=v_asc2, kind='stable')
+
     # Filter
     if 'Gross Amount of 100% of Invoice' in df.columns:
         df = df[df['Gross Amount of 100% of Invoice'].abs() >= 2000]
 
     # Merge images
-    inv_col = 'Invoice #' if 'Invoice #' in ref_df.columns else ref_df.columns[0]
-    inv_idx = ref_df.columns.get_loc(inv_col)
-    
-    img_cols = ref_df.columns[inv_idx+1 : inv_idx+5]
-    img_map = ref_df.drop_duplicates(subset=[inv_col]).set_index(inv_col)[img_cols].to_dict('index')
-    
-    img1, img2, img3, img4 = [], [], [], []
-    for inv in df['Txn Invoice No']:
-        imgs = img_map.get(inv, {})
-        vals = [imgs.get(c, 0) for c in img_cols]
-        vals = [v if pd.notna(v) and str(v).strip() != '' else 0 for v in vals]
-        vals += [0] * (4 - len(vals))
-        img1.append(vals[0])
-        img2.append(vals[1])
-        img3.append(vals[2])
-        img4.append(vals[3])
-    
-    df['Image 1 from Elk Look-up'] = img1
-    df['Image 2 from Elk Look-up'] = img2
-    df['Image 3 from Elk Look-up'] = img3
-    df['Image 4 from Elk Look-up'] = img4
-
-    # Remove GJ or PE
-    mask = df['Txn Invoice No'].astype(str).str.upper().str.startswith('GJ') | df['Txn Invoice No'].astype(str).str.upper().str.startswith('PE')
-    df = df[~mask].reset_index(drop=True)
-
-    # Sequence No
-    is_first = (df['Txn Invoice No'] != df['Txn Invoice No'].shift(1))
-    seq_no = is_first.cumsum()
+    img_cols = list(img_lookup.columns)
+    # The lookup is unique-keyed, so one reindex builds the row alignment
+    # for every image column at once; per-column work is then just a take
+    aligned = img_lookup.reindex(df['Txn Invoice No'].astype(object))
+    for j, c in enumerate(img_cols):
+        # Fill blanks on an object array so the 0 filler stays an int;
+        # np.where on a float-dtype column (e.g. an all-empty image
+        # column loaded as NaN float64) would promote it to 0.0, which
+        # slips past the '0' sentinel check in the link builder below.
+        vals = aligned[c].to_numpy(dtype=object)
+        s = pd.Series(vals, index=df.index)
+        blank = (s.isna() | (s.astype(str).str.strip() == '')).to_numpy()
+        vals[blank] = 0
+        df[f'Image {j+1} from Elk Look-up'] = pd.Series(vals, index=df.index)
+
+    # Sequence No: the invoice column was factorized once by the category
+    # cast at load, so reuse those integer codes here — adjacent code
+    # inequality gives the first-occurrence flags and their cumsum the
+    # sequence numbers, with no further hashing of the column.
+    inv_codes = df['Txn Invoice No'].cat.codes.to_numpy()
+    first_flags = np.ones(len(inv_codes), dtype=bool)
+    first_flags[1:] = inv_codes[1:] != inv_codes[:-1]
+    seq_no = pd.Series(first_flags.cumsum(), index=df.index)
     df.insert(0, 'For Sequence #', seq_no)
-    df.insert(1, 'Sequence #', seq_no.apply(lambda x: f"{x:03d}"))
+    pad = seq_no.astype(str).str.zfill(3)
+    df.insert(1, 'Sequence #', pad)
 
     y_str = str(year)[-2:] if len(str(year))==4 else str(year)
-    m_str = f"{int(months[0]):02d}"
-    df['Filename of Image for the UT Tax Comm.'] = np.where(is_first, f"S20{y_str}{m_str}-" + df['Sequence #'] + ".pdf", 0)
+    m_str = f"{int(month):02d}"
+    names = (f"S20{y_str}{m_str}-" + pad + ".pdf").to_numpy()
+    df['Filename of Image for the UT Tax Comm.'] = np.where(first_flags, names, 0)
 
     # Quarter math
-    cur_q_num = (int(months[0]) - 1) // 3 + 1
+    cur_q_num = (int(month) - 1) // 3 + 1
     next_q_num = (cur_q_num % 4) + 1
     cur_q = f"Q{cur_q_num}"
     next_q = f"Q{next_q_num}"
     cur_year = str(year)
     next_year = str(year) if next_q_num > 1 else str(int(year) + 1)
     
+    # The four formula prefixes depend only on the quarter, so build them
+    # once per month rather than once per image column and path
+    variants = []
+    for pfx, q_str, yr_str in (
+        (DROPBOX_BASE, cur_q, cur_year),
+        (DROPBOX_BASE, next_q, next_year),
+        (F_DRIVE_BASE, cur_q, cur_year),
+        (F_DRIVE_BASE, next_q, next_year),
+    ):
+        base = f"{pfx}\\{IMAGE_ROOT}\\{yr_str} {q_str} Invoices\\"
+        variants.append(('=HYPERLINK("' + base, '", "' + base))
+
     db_links = []
     f_links = []
-    
-    for i in range(1, 5):
+    link_data = {}
+
+    for i in range(1, len(img_cols) + 1):
         lookup_col = f'Image {i} from Elk Look-up'
         db_cur = f'www.dropbox.com Link to Image {i} for {cur_q}'
         db_next = f'www.dropbox.com Link to Image {i} for {next_q}'
         f_cur = f'F drive Link to Image {i} for {cur_q}'
         f_next = f'F drive Link to Image {i} for {next_q}'
-        
+
         db_links.extend([db_cur, db_next])
         f_links.extend([f_cur, f_next])
-        
-        def make_link(val, pfx, q_str, yr_str, first):
-            if not first or str(val) == '0' or not str(val).strip() or str(val).strip() == 'nan':
-                return 0
-            if pfx == 'www.dropbox.com':
-                path = f"{pfx}\\Images MP-BC-AP R4Q2\\{yr_str} {q_str} Invoices\\{val}"
-            else:
-                path = f"{pfx}\\Images MP-BC-AP R4Q2\\{yr_str} {q_str} Invoices\\{val}"
-            return f'=HYPERLINK("{path}", "{path}")'
-            
-        df[db_cur] = [make_link(img, "www.dropbox.com", cur_q, cur_year, first) for img, first in zip(df[lookup_col], is_first)]
-        df[db_next] = [make_link(img, "www.dropbox.com", next_q, next_year, first) for img, first in zip(df[lookup_col], is_first)]
-        
-        df[f_cur] = [make_link(img, "F:", cur_q, cur_year, first) for img, first in zip(df[lookup_col], is_first)]
-        df[f_next] = [make_link(img, "F:", next_q, next_year, first) for img, first in zip(df[lookup_col], is_first)]
-        
-    add_cols = [
-        'UT + SJ Combined Sales Tax',
-        'Utah State Sales Tax',
-        'San Juan County Sales Tax',
-        'Other local Utah tax',
-        'Other entity collecting tax',
-        'Sum of UT Tx Excl Chrgd by N.N.',
-        'NNOGC Entity Tax Pd Amt',
-        'Poley Team Notes'
-    ]
-    for c in add_cols:
-        if c not in df.columns:
-            df[c] = ''
-
-    all_cols = list(df.columns)
-    link_set = set(db_links + f_links)
-    base_cols = [c for c in all_cols if c not in link_set]
-    
+
+        # Vectorized: one string pass per column instead of a Python call per row
+        s = df[lookup_col].astype(str).str.strip()
+        mask = first_flags & ((s != '0') & (s != '') & (s != 'nan')).to_numpy()
+
+        # Formulas only exist on first-occurrence rows with a valid image,
+        # so build them on the gathered raw array (one entry per flagged
+        # row, not the whole column) and scatter into prefilled columns.
+        idx = np.flatnonzero(mask)
+        sv = s.to_numpy(dtype=object)[idx]
+        # The closing of the formula is identical across all four path
+        # variants, so build it once per image column
+        tail = sv + '")'
+
+        for link_col, (head, mid) in zip((db_cur, db_next, f_cur, f_next), variants):
+            col = np.full(len(df), 0, dtype=object)
+            col[idx] = head + sv + mid + tail
+            link_data[link_col] = col
+
+    # Insert all link columns in one assign instead of 16 separate
+    # column insertions on a wide frame
+    df = df.assign(**link_data)
+
+    # One assign instead of eight separate column insertions
+    missing = [c for c in EXTRA_TAX_COLS if c not in df.columns]
+    if missing:
+        df = df.assign(**{c: '' for c in missing})
+
+    # frozenset for O(1) membership, dict.fromkeys for an order-preserving
+    # dedup of the reassembled list in one C-level pass
+    link_set = frozenset(db_links + f_links)
+    base_cols = [c for c in df.columns if c not in link_set]
+
     try:
         idx_tc = base_cols.index('Filename of Image for the UT Tax Comm.')
         final_cols = base_cols[:idx_tc] + db_links + f_links + base_cols[idx_tc:]
     except ValueError:
-        final_cols = base_cols + db_links + f_links 
-        
-    df = df[final_cols]
+        final_cols = base_cols + db_links + f_links
+
+    # Single materialization of the widest frame: the column selection and
+    # index reset happen in one pass here instead of an extra full copy
+    # back before the sequence numbering
+    df = df.loc[:, list(dict.fromkeys(final_cols))].reset_index(drop=True)
     
     print(f"Writing Excel to {out_path if out_path else 'Current Directory'}...")
     
@@ -180,23 +411,41 @@ def run(jib_path, ref_path, out_path, year, months):
         else:
             out_path = out_filename
             
-    writer = pd.ExcelWriter(out_path, engine='xlsxwriter', engine_kwargs={'options': {'strings_to_formulas': True}})
-    
     # Remove timezone info for excel export if needed
     for col in df.select_dtypes(include=['datetime64[ns, UTC]', 'datetime64[ns]']).columns:
         df[col] = df[col].dt.tz_localize(None)
 
-    df.to_excel(writer, index=False, sheet_name='sales tax by invoice')
-    
-    workbook = writer.book
-    worksheet = writer.sheets['sales tax by invoice']
-    
+    # constant_memory streams each row to disk as it is written instead of
+    # buffering the whole sheet, so peak memory no longer scales with the
+    # report. Rows must be written strictly top to bottom, so all column
+    # setup happens before the data rows below.
+    workbook = xlsxwriter.Workbook(out_path, {
+        'constant_memory': True,
+        'default_date_format': 'm/d/yyyy h:mm AM/PM',
+        # Hyperlinks are dispatched straight to write_formula below, so
+        # the per-cell URL and formula detection scans are pure overhead
+        # (and a data string starting with '=' can no longer be
+        # misread as a formula)
+        'strings_to_urls': False,
+        'strings_to_formulas': False,
+    })
+    worksheet = workbook.add_worksheet('sales tax by invoice')
+
     date_format = workbook.add_format({'num_format': 'm/d/yyyy h:mm AM/PM'})
     header_format = workbook.add_format({'bold': True, 'border': 1})
-    
-    for col_num, value in enumerate(df.columns.values):
-        worksheet.write(0, col_num, value, header_format)
-        
+
+    # Data-driven widths: length scan over the first 1000 rows per column
+    # (widths are a display heuristic — no need to touch every row),
+    # capped at 50. Hidden groups and date columns are set afterwards
+    # and override.
+    for i, c in enumerate(df.columns):
+        data_len = df[c].head(1000).astype(str).str.len().max()
+        # max() over an empty frame is NaN, which is truthy — guard
+        # explicitly so a month with no qualifying rows still writes
+        # its header-only report instead of crashing here.
+        data_len = 0 if pd.isna(data_len) else int(data_len)
+        worksheet.set_column(i, i, min(max(data_len, len(str(c))) + 2, 50))
+
     def group_cols(start_name, end_name=None):
         if start_name in df.columns:
             start_idx = df.columns.get_loc(start_name)
@@ -206,11 +455,8 @@ def run(jib_path, ref_path, out_path, year, months):
             else:
                 worksheet.set_column(start_idx, start_idx, None, None, {'hidden': True, 'level': 1})
 
-    group_cols('Owner', 'Billing Cat Type') 
-    group_cols('Txn Net Amt', 'Interest')
-    group_cols('Property Hid', 'Vendor Code')
-    group_cols('Addr 1')
-    group_cols('Billing Date', 'Color Code')
+    for start_name, end_name in HIDDEN_COL_GROUPS:
+        group_cols(start_name, end_name)
     
     if 'Color Code' in df.columns and 'Gross amount of first occurrence' in df.columns:
         start_idx = df.columns.get_loc('Color Code') + 1
@@ -225,10 +471,31 @@ def run(jib_path, ref_path, out_path, year, months):
         idx = df.columns.get_loc('Txn Acct Date')
         worksheet.set_column(idx, idx, 20, date_format)
 
-    writer.close()
+    worksheet.write_row(0, 0, df.columns, header_format)
+    # Link and filename columns hold a literal 0 on every non-first row
+    # (the vast majority); turning those into blanks keeps the cells out
+    # of the sheet entirely, shrinking the file and the write cost.
+    for c in db_links + f_links + ['Filename of Image for the UT Tax Comm.']:
+        if c in df.columns:
+            df[c] = df[c].where(df[c] != 0, None)
+    # NaN/NaT become None so xlsxwriter writes blanks, as to_excel did
+    out = df.astype(object).where(df.notna(), None)
+    formula_cols = [i for i, c in enumerate(df.columns) if c in link_set]
+    for r, row in enumerate(out.itertuples(index=False, name=None), start=1):
+        if formula_cols:
+            row = list(row)
+            for ci in formula_cols:
+                if row[ci] is not None:
+                    worksheet.write_formula(r, ci, row[ci])
+                    row[ci] = None
+        worksheet.write_row(r, 0, row)
+
+    workbook.close()
     print(f"Successfully created {out_path}")
 
 if __name__ == '__main__':
+    # Required for multiprocessing inside the PyInstaller-frozen exe
+    multiprocessing.freeze_support()
     parser = argparse.ArgumentParser(description="Process Sales Tax")
     parser.add_argument('--auto', help='Path to text file with paths', type=str)
     